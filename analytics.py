@@ -0,0 +1,118 @@
+import threading
+from collections import deque
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from state import PsdResult, TrackResult, _window
+
+IMU_FIELDS = ('t', 'ax', 'ay', 'az', 'gx', 'gy', 'gz')
+
+
+def find_peaks(f, p, k=3, ratio=10.0):
+    """Up to k local maxima of p standing `ratio` times above the median floor (DC excluded)."""
+    if p.size < 3:
+        return []
+    idx = np.nonzero((p[1:-1] > p[:-2]) & (p[1:-1] >= p[2:]))[0] + 1
+    idx = idx[p[idx] > ratio * np.median(p[1:])]
+    top = np.sort(idx[np.argsort(p[idx])[::-1][:k]])
+    return [(float(f[i]), float(p[i])) for i in top]
+
+
+class AnalyticsEngine:
+    """Background stage computing IMU vibration spectra and velocity tracking error.
+
+    Runs at args.analytics_hz on its own thread (independent of the plot interval) and
+    publishes results into state.analytics. Welch PSD segments (Hann, 50% overlap) are
+    cached, so each tick only FFTs the segments completed since the previous one.
+    """
+    def __init__(self, state, args, logger):
+        self.state = state
+        self.args = args
+        self.logger = logger
+        self.nperseg = args.psd_seg
+        self.hop = max(1, self.nperseg // 2)
+        self._win = np.hanning(self.nperseg)
+        self._wss = float((self._win ** 2).sum())
+        self._segs = deque(maxlen=args.psd_avg)  # (fs, pxx[6, nfreq]) per processed segment
+        self._next_t = None  # timestamp of the first sample of the next segment
+        self._trk = deque(maxlen=args.window)  # (t, ex, ey, ez, norm)
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ----------------- Lifecycle -----------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='analytics', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Analytics engine started ({self.args.analytics_hz} Hz, PSD seg={self.nperseg})")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        period = 1.0 / self.args.analytics_hz
+        while not self._stop.wait(period):
+            try:
+                self.step()
+            except Exception as e:
+                self.logger.warning(f"Analytics step failed: {e}")
+
+    def step(self):
+        imu = trk = None
+        with self.state.lock:
+            if self.args.show_psd:
+                # only samples not yet consumed by a segment
+                imu = _window([getattr(self.state.imu, n) for n in IMU_FIELDS], self._next_t)
+            vel = self.state.vel
+            if self.args.show_track and vel.t:
+                trk = vel.aligned(vel.t[-1] - self.args.track_window)
+        if imu is not None:
+            self._update_psd(imu)
+        if trk is not None:
+            self._update_track(trk)
+
+    # ----------------- Vibration spectra -----------------
+    def _update_psd(self, imu):
+        n = min(len(a) for a in imu)
+        t = imu[0][:n]; x = np.vstack([a[:n] for a in imu[1:]])
+        i0 = 0 if self._next_t is None else int(np.searchsorted(t, self._next_t))
+        avail = n - i0
+        if avail < self.nperseg:
+            return
+        nseg = (avail - self.nperseg) // self.hop + 1
+        starts = i0 + self.hop * np.arange(nseg)
+        seg = sliding_window_view(x[:, i0:], self.nperseg, axis=1)[:, ::self.hop][:, :nseg]
+        seg = seg - seg.mean(axis=-1, keepdims=True)
+        spec = np.abs(np.fft.rfft(seg * self._win, axis=-1)) ** 2
+        # sample rate estimated per segment from timestamps (samples assumed evenly spaced)
+        dur = t[starts + self.nperseg - 1] - t[starts]
+        fs = np.where(dur > 0, (self.nperseg - 1) / np.where(dur > 0, dur, 1.0), np.nan)
+        pxx = spec / (fs[None, :, None] * self._wss)
+        pxx[..., 1:(-1 if self.nperseg % 2 == 0 else None)] *= 2.0
+        for j in range(nseg):
+            if np.isfinite(fs[j]):
+                self._segs.append((float(fs[j]), pxx[:, j]))
+        self._next_t = float(t[starts[-1] + self.hop])
+        if not self._segs:
+            return
+        fs_mean = float(np.mean([s[0] for s in self._segs]))
+        p = np.mean([s[1] for s in self._segs], axis=0)
+        f = np.fft.rfftfreq(self.nperseg, 1.0 / fs_mean)
+        acc = p[0:3].sum(axis=0); gyro = p[3:6].sum(axis=0)
+        self.state.analytics.psd = PsdResult(f, acc, gyro, find_peaks(f, acc), find_peaks(f, gyro), fs_mean, len(self._segs))
+
+    # ----------------- Tracking error -----------------
+    def _update_track(self, trk):
+        t, vx, vy, vz, vx_sp, vy_sp, vz_sp = trk
+        if t.size == 0 or (self._trk and self._trk[-1][0] >= t[-1]):
+            return
+        e = np.vstack([vx - vx_sp, vy - vy_sp, vz - vz_sp])
+        e = e[:, np.all(np.isfinite(e), axis=0)]
+        if e.shape[1] == 0:
+            return
+        rms = np.sqrt(np.mean(e ** 2, axis=1))
+        self._trk.append((float(t[-1]), *rms, float(np.sqrt((rms ** 2).sum()))))
+        self.state.analytics.track = TrackResult(*np.array(self._trk).T)
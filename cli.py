@@ -9,7 +9,12 @@ def _build_parser():
     p.add_argument('--time-window', type=float, default=15.0, help='Seconds shown on X axis')
     p.add_argument('--interval', type=int, default=60, help='Plot update interval ms')
     p.add_argument('--log', default='/home/hw/qgc-planning/logs/mavviz.log', help='Log file path')
-    p.add_argument('--plots', choices=['basic','nav','imu','full'], default='full', help='Preset plot set')
+    p.add_argument('--plots', choices=['basic','nav','imu','analytics','full'], default='full', help='Preset plot set')
+    p.add_argument('--analytics-hz', type=float, default=2.0, help='Analytics (PSD / tracking error) update rate')
+    p.add_argument('--psd-seg', type=int, default=64, help='IMU PSD segment length (samples, 50%% overlap)')
+    p.add_argument('--psd-avg', type=int, default=8, help='Number of recent PSD segments averaged')
+    p.add_argument('--sync-hz', type=float, default=2.0, help='TIMESYNC request rate for clock offset / latency estimation')
+    p.add_argument('--track-window', type=float, default=2.0, help='Seconds of velocity used for RMS tracking error')
     p.add_argument('--mission-mode', choices=['off','passive','active'], default='active', help='Mission handling mode')
     return p
 
@@ -20,18 +25,23 @@ def _expand_presets(args):
     setattr(args, 'passive_mission', args.mission_mode == 'passive')
     setattr(args, 'mission_request', args.mission_mode == 'active')
     setattr(args, 'mission_forward', '')
-    show_vel = show_imu = show_alt = show_gps = show_servo = False
+    show_vel = show_imu = show_alt = show_gps = show_servo = show_psd = show_track = show_link = False
     if args.plots == 'nav':
-        show_vel = show_alt = True
+        show_vel = show_alt = show_track = show_link = True
     elif args.plots == 'imu':
-        show_imu = True
+        show_imu = show_psd = True
+    elif args.plots == 'analytics':
+        show_vel = show_imu = show_psd = show_track = show_link = True
     elif args.plots == 'full':
-        show_vel = show_imu = show_alt = show_gps = show_servo = True
+        show_vel = show_imu = show_alt = show_gps = show_servo = show_psd = show_track = show_link = True
     setattr(args, 'show_vel', show_vel)
     setattr(args, 'show_imu', show_imu)
     setattr(args, 'show_alt', show_alt)
     setattr(args, 'show_gps', show_gps)
     setattr(args, 'show_servo', show_servo)
+    setattr(args, 'show_psd', show_psd)
+    setattr(args, 'show_track', show_track)
+    setattr(args, 'show_link', show_link)
     # Resolve dual connection defaults
     if not args.conn_active and not args.conn_passive:
         args.conn_active = args.conn
@@ -46,4 +56,12 @@ def _expand_presets(args):
 def get_args():
     parser = _build_parser()
     args = parser.parse_args()
+    if args.psd_seg < 4:
+        parser.error('--psd-seg must be >= 4')
+    if args.psd_seg > args.window:
+        parser.error(f'--psd-seg ({args.psd_seg}) must not exceed --window ({args.window})')
+    if args.psd_avg < 1:
+        parser.error('--psd-avg must be >= 1')
+    if args.analytics_hz <= 0:
+        parser.error('--analytics-hz must be > 0')
     return _expand_presets(args)
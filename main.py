@@ -6,6 +6,7 @@ import matplotlib.animation as animation
 import time, signal, sys, logging
 from state import create_state, AppState
 from mavlink_client import MavlinkClient
+from analytics import AnalyticsEngine
 from plotter import build_layout, update_plots
 from logutil import setup_logger
 from cli import get_args
@@ -42,6 +43,10 @@ if args.mission_request and not args.no_mission and not args.passive_mission:
 elif args.passive_mission:
     logger.info("Passive mission mode enabled (no active requests)")
 
+analytics = AnalyticsEngine(state, args, logger)
+if args.show_psd or args.show_track:
+    analytics.start()
+
 ctx = build_layout(args, TIME_WINDOW)
 running = True
 
@@ -69,6 +74,7 @@ def shutdown(*_):
     running = False
     try: ani.event_source.stop()
     except Exception: pass
+    analytics.stop()
     client.close()
     plt.close(ctx.fig)
 
@@ -1,6 +1,10 @@
 import time
 import numpy as np
 from pymavlink import mavutil
+from timesync import TimeSync, remote_time
+
+# Message types sharing one buffer keep a common monotonic time key
+_TIME_KEY = {'ODOMETRY': 'LOCAL_POSITION_NED', 'GLOBAL_POSITION_INT': 'ALTITUDE'}
 
 class MavlinkClient:
     def __init__(self, conn_active, logger, state, args, conn_passive=None):
@@ -13,6 +17,11 @@ class MavlinkClient:
         self.m_passive = None
         self.start_time = None
         self.last_t = 0.0
+        self.timesync = TimeSync(logger, rate_hz=getattr(args, 'sync_hz', 2.0))
+        self._last_t_key = {}
+        self._last_remote = {}  # tname -> newest vehicle time seen (dedup across links)
+        self._sync_epoch = 0
+        self._lat_batch = []
         # Mission download state
         self.mdl_active = False
         self.mdl_expected = 0
@@ -207,14 +216,48 @@ class MavlinkClient:
         self.last_t = t
         return t
 
+    def _from_autopilot(self, msg):
+        return msg.get_srcSystem() == self.autopilot_sysid and msg.get_srcComponent() == self.autopilot_compid
+
+    def _msg_time(self, msg, tname, conn):
+        """Message time from its own boot timestamp mapped to local time; drain time until synced.
+
+        Only autopilot messages are mapped (other components run their own clocks). Returns
+        None for an autopilot sample whose vehicle time was already seen for its type, e.g.
+        the passive-link copy of a sample received on the active link.
+        """
+        if self.timesync.epoch != self._sync_epoch:
+            self._sync_epoch = self.timesync.epoch; self._last_remote.clear()
+        rt = remote_time(msg) if self._from_autopilot(msg) else None
+        local = self.timesync.to_local(rt)
+        if local is None:
+            t = self._next_time()
+        else:
+            seen = self._last_remote.get(tname)
+            if seen is not None and rt <= seen:
+                return None
+            self._last_remote[tname] = rt
+            if conn is (self.m_passive or self.m_active):
+                self._lat_batch.append(time.time() - local)
+            t = local - self.start_time
+        # keep each buffer monotonic across the message types feeding it
+        key = _TIME_KEY.get(tname, tname)
+        last = self._last_t_key.get(key)
+        if last is not None and t <= last:
+            t = last + 1e-6
+        self._last_t_key[key] = t
+        return t
+
     # ----------------- Polling -----------------
     def poll(self):
         if not self.m_active:
             return
         self._send_heartbeat()
+        if self.autopilot_sysid is not None:
+            self.timesync.tick(self.m_active, self.autopilot_sysid, self.autopilot_compid)
         pos_buf = self.state.pos; att_buf = self.state.att; vel_buf = self.state.vel
         imu_buf = self.state.imu; alt_buf = self.state.alt; gps_buf = self.state.gps
-        servo_buf = self.state.servo; missions = self.state.mission.missions; args = self.args
+        servo_buf = self.state.servo; link_buf = self.state.link; missions = self.state.mission.missions; args = self.args
         # Drain function patched to include heartbeat correction
         def drain(conn):
             while True:
@@ -222,29 +265,20 @@ class MavlinkClient:
                 if not msg: break
                 if msg.get_type() == 'HEARTBEAT':
                     self._maybe_correct_target(msg)
-                tname = msg.get_type(); t = self._next_time()
+                tname = msg.get_type(); t = self._msg_time(msg, tname, conn)
+                if t is None: continue
                 if tname == "LOCAL_POSITION_NED":
                     if all(hasattr(msg,a) for a in ('x','y','z')):
                         pos_buf.t.append(t); pos_buf.x.append(msg.x); pos_buf.y.append(msg.y); pos_buf.z.append(msg.z)
                     if args.show_vel and all(hasattr(msg,a) for a in ('vx','vy','vz')):
                         vel_buf.t.append(t); vel_buf.vx.append(msg.vx); vel_buf.vy.append(msg.vy); vel_buf.vz.append(msg.vz)
-                        vel_buf.vx_sp.append(vel_buf.vx_sp[-1] if vel_buf.vx_sp else 0)
-                        vel_buf.vy_sp.append(vel_buf.vy_sp[-1] if vel_buf.vy_sp else 0)
-                        vel_buf.vz_sp.append(vel_buf.vz_sp[-1] if vel_buf.vz_sp else 0)
                 elif tname == "ODOMETRY":
                     if all(hasattr(msg,a) for a in ('x','y','z')):
                         pos_buf.t.append(t); pos_buf.x.append(getattr(msg,'x',0)); pos_buf.y.append(getattr(msg,'y',0)); pos_buf.z.append(getattr(msg,'z',0))
                     if args.show_vel and all(hasattr(msg,a) for a in ('vx','vy','vz')):
                         vel_buf.t.append(t); vel_buf.vx.append(getattr(msg,'vx',0)); vel_buf.vy.append(getattr(msg,'vy',0)); vel_buf.vz.append(getattr(msg,'vz',0))
-                        vel_buf.vx_sp.append(vel_buf.vx_sp[-1] if vel_buf.vx_sp else 0)
-                        vel_buf.vy_sp.append(vel_buf.vy_sp[-1] if vel_buf.vy_sp else 0)
-                        vel_buf.vz_sp.append(vel_buf.vz_sp[-1] if vel_buf.vz_sp else 0)
                 elif tname == "POSITION_TARGET_LOCAL_NED" and args.show_vel:
-                    vel_buf.t.append(t)
-                    vel_buf.vx.append(vel_buf.vx[-1] if vel_buf.vx else 0)
-                    vel_buf.vy.append(vel_buf.vy[-1] if vel_buf.vy else 0)
-                    vel_buf.vz.append(vel_buf.vz[-1] if vel_buf.vz else 0)
-                    vel_buf.vx_sp.append(getattr(msg,'vx',0)); vel_buf.vy_sp.append(getattr(msg,'vy',0)); vel_buf.vz_sp.append(getattr(msg,'vz',0))
+                    vel_buf.t_sp.append(t); vel_buf.vx_sp.append(getattr(msg,'vx',0)); vel_buf.vy_sp.append(getattr(msg,'vy',0)); vel_buf.vz_sp.append(getattr(msg,'vz',0))
                 elif tname == "ATTITUDE" and not args.no_attitude:
                     att_buf.t.append(t); att_buf.roll.append(msg.roll); att_buf.pitch.append(msg.pitch); att_buf.yaw.append(msg.yaw)
                 elif tname == "HIGHRES_IMU" and args.show_imu:
@@ -259,6 +293,10 @@ class MavlinkClient:
                 elif tname == "SERVO_OUTPUT_RAW" and args.show_servo:
                     servo_buf.t.append(t)
                     for i in range(8): servo_buf.ch[i].append(getattr(msg,f'servo{i+1}_raw',1500))
+                elif tname == "TIMESYNC" and self._from_autopilot(msg):
+                    self.timesync.handle_timesync(msg)
+                elif tname == "SYSTEM_TIME" and self._from_autopilot(msg):
+                    self.timesync.handle_system_time(msg)
                 elif tname == "MISSION_COUNT" and not self.args.no_mission:
                     if conn is self.m_active and self.mdl_active:
                         self.mdl_expected = getattr(msg,'count',0)
@@ -286,9 +324,16 @@ class MavlinkClient:
                 elif tname == "MISSION_CURRENT" and not self.args.no_mission:
                     pass
         # Drain active first (authoritative for mission protocol), then passive
-        drain(self.m_active)
-        if self.m_passive:
-            drain(self.m_passive)
+        with self.state.lock:
+            drain(self.m_active)
+            if self.m_passive:
+                drain(self.m_passive)
+            # one end-to-end latency point per poll (median of the stamped messages drained)
+            if self._lat_batch:
+                link_buf.t.append(time.time() - self.start_time)
+                link_buf.lat_ms.append(float(np.median(self._lat_batch)) * 1e3)
+                link_buf.rtt_ms.append(self.timesync.rtt * 1e3 if self.timesync.rtt is not None else np.nan)
+                self._lat_batch.clear()
         self._mission_download_tick()
 
     def _send_heartbeat(self):
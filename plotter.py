@@ -1,4 +1,5 @@
 import matplotlib.pyplot as plt
+import numpy as np
 
 class PlotContext:
     def __init__(self):
@@ -19,6 +20,9 @@ def build_layout(args, TIME_WINDOW):
     if args.show_alt: subplot_list.append('alt')
     if args.show_gps: subplot_list.append('gps')
     if args.show_servo: subplot_list.append('servo')
+    if args.show_psd: subplot_list.append('psd')
+    if args.show_track: subplot_list.append('track')
+    if args.show_link: subplot_list.append('link')
     extra_n = len(subplot_list)
     cols = 2
     rows = 1 + (extra_n + (0 if args.no_mission else 0) + 1) // cols
@@ -53,7 +57,10 @@ def build_layout(args, TIME_WINDOW):
     if 'vel' in ctx.axes_extra:
         ax = ctx.axes_extra['vel']; ax.set_title('Velocity'); ax.grid(True)
         for n in ('vx','vy','vz','vx_sp','vy_sp','vz_sp'):
-            ctx.lines[n], = ax.plot([],[], '--' if 'sp' in n else '-', label=n)
+            if 'sp' in n:
+                ctx.lines[n], = ax.plot([],[], '--', drawstyle='steps-post', label=n)
+            else:
+                ctx.lines[n], = ax.plot([],[], '-', label=n)
         ax.legend()
     if 'imu' in ctx.axes_extra:
         ax = ctx.axes_extra['imu']; ax.set_title('IMU'); ax.grid(True)
@@ -75,6 +82,23 @@ def build_layout(args, TIME_WINDOW):
         ax.set_ylim(800,2200); ax.set_ylabel('PWM'); ax.set_xticks(range(8)); ax.set_xticklabels([str(i+1) for i in range(8)])
         ax.grid(True, axis='y')
         ctx.servo_art = ax.bar(range(8), [1500]*8)
+    if 'psd' in ctx.axes_extra:
+        ax = ctx.axes_extra['psd']; ax.set_title('Vibration PSD'); ax.grid(True, which='both')
+        ax.set_yscale('log'); ax.set_xlabel('Freq [Hz]')
+        ctx.lines['psd_acc'], = ax.plot([],[], label='acc')
+        ctx.lines['psd_gyro'], = ax.plot([],[], label='gyro')
+        ctx.lines['psd_peaks'], = ax.plot([],[], 'rv', label='peaks')
+        ax.legend()
+    if 'track' in ctx.axes_extra:
+        ax = ctx.axes_extra['track']; ax.set_title('Velocity tracking RMS error'); ax.grid(True)
+        for n in ('ex','ey','ez','norm'):
+            ctx.lines[f'trk_{n}'], = ax.plot([],[], label=n)
+        ax.legend()
+    if 'link' in ctx.axes_extra:
+        ax = ctx.axes_extra['link']; ax.set_title('Link latency'); ax.set_ylabel('ms'); ax.grid(True)
+        ctx.lines['link_lat'], = ax.plot([],[], label='e2e')
+        ctx.lines['link_rtt'], = ax.plot([],[], '--', label='rtt')
+        ax.legend()
     return ctx
 
 
@@ -128,19 +152,26 @@ def update_plots(ctx, state, args, TIME_WINDOW):
             ax.set_ylim(mn-0.5, mx+0.5)
         artists.extend([lines['alt_amsl'], lines['alt_rel']])
     # velocity
-    if args.show_vel and vel.t:
-        tv = list(vel.t)
-        for n in ('vx','vy','vz','vx_sp','vy_sp','vz_sp'):
-            lines[n].set_data(tv, list(getattr(vel,n)))
-        vv = list(vel.vx)+list(vel.vy)+list(vel.vz)+list(vel.vx_sp)+list(vel.vy_sp)+list(vel.vz_sp)
+    if args.show_vel and (vel.t or vel.t_sp):
         ax = ctx.axes_extra['vel']
-        # compute axis specific left/right
-        if vel.t:
-            v_left_span = vel.t[0] if (vel.t[-1]-vel.t[0]) < TIME_WINDOW else vel.t[-1]-TIME_WINDOW
-            v_right = vel.t[-1] + 0.05*(vel.t[-1]-vel.t[0] + 1e-6)
-            ax.set_xlim(v_left_span, v_right)
-        if vv:
-            vmin, vmax = min(vv), max(vv)
+        # compute axis specific left/right over both streams
+        v_first = min(d[0] for d in (vel.t, vel.t_sp) if d)
+        v_last = max(d[-1] for d in (vel.t, vel.t_sp) if d)
+        v_left_span = v_first if (v_last-v_first) < TIME_WINDOW else v_last-TIME_WINDOW
+        v_right = v_last + 0.05*(v_last-v_first + 1e-6)
+        ax.set_xlim(v_left_span, v_right)
+        # visible window only; setpoints drawn as steps from their own timestamps
+        tv, *meas = vel.measured(v_left_span)
+        ts, *sp = vel.setpoints(v_left_span)
+        if ts.size:
+            # hold the latest setpoint up to the newest sample of either stream
+            ts = np.append(ts, max(v_last, ts[-1])); sp = [np.append(a, a[-1]) for a in sp]
+        for n, v in zip(('vx','vy','vz'), meas): lines[n].set_data(tv, v)
+        for n, v in zip(('vx_sp','vy_sp','vz_sp'), sp): lines[n].set_data(ts, v)
+        vv = np.concatenate(meas + sp)
+        vv = vv[np.isfinite(vv)]
+        if vv.size:
+            vmin, vmax = float(vv.min()), float(vv.max())
             if vmin == vmax: vmin -= 0.5; vmax += 0.5
             ax.set_ylim(vmin-0.2, vmax+0.2)
         for n in ('vx','vy','vz','vx_sp','vy_sp','vz_sp'): artists.append(lines[n])
@@ -180,6 +211,47 @@ def update_plots(ctx, state, args, TIME_WINDOW):
         latest = [ch[-1] if ch else 1500 for ch in servo.ch]
         for rect, val in zip(ctx.servo_art, latest): rect.set_height(val)
         artists.extend(list(ctx.servo_art))
+    # vibration spectra (computed by analytics engine)
+    psd = state.analytics.psd
+    if args.show_psd and psd is not None and psd.f.size > 1:
+        lines['psd_acc'].set_data(psd.f[1:], psd.acc[1:]); lines['psd_gyro'].set_data(psd.f[1:], psd.gyro[1:])
+        peaks = psd.peaks_acc + psd.peaks_gyro
+        lines['psd_peaks'].set_data([pk[0] for pk in peaks], [pk[1] for pk in peaks])
+        ax = ctx.axes_extra['psd']
+        ax.set_xlim(0, psd.f[-1])
+        pv = np.concatenate([psd.acc[1:], psd.gyro[1:]]); pv = pv[pv > 0]
+        if pv.size:
+            ax.set_ylim(pv.min()*0.5, pv.max()*2)
+        pk_txt = ', '.join(f'{pk[0]:.0f}' for pk in sorted(peaks)) or '-'
+        ax.set_title(f'Vibration PSD (fs~{psd.fs:.0f} Hz, peaks~{pk_txt} Hz)')
+        artists.extend([lines['psd_acc'], lines['psd_gyro'], lines['psd_peaks']])
+    # tracking error
+    trk = state.analytics.track
+    if args.show_track and trk is not None and trk.t.size:
+        for n in ('ex','ey','ez','norm'):
+            lines[f'trk_{n}'].set_data(trk.t, getattr(trk, n))
+        ax = ctx.axes_extra['track']
+        k_left = trk.t[0] if (trk.t[-1]-trk.t[0]) < TIME_WINDOW else trk.t[-1]-TIME_WINDOW
+        k_right = trk.t[-1] + 0.05*(trk.t[-1]-trk.t[0] + 1e-6)
+        ax.set_xlim(k_left, k_right)
+        ax.set_ylim(0, max(float(trk.norm.max()), 0.1)*1.1)
+        for n in ('ex','ey','ez','norm'): artists.append(lines[f'trk_{n}'])
+    # link latency
+    link = state.link
+    if args.show_link and link.t:
+        tl = list(link.t)
+        lines['link_lat'].set_data(tl, list(link.lat_ms)); lines['link_rtt'].set_data(tl, list(link.rtt_ms))
+        ax = ctx.axes_extra['link']
+        l_left = link.t[0] if (link.t[-1]-link.t[0]) < TIME_WINDOW else link.t[-1]-TIME_WINDOW
+        l_right = link.t[-1] + 0.05*(link.t[-1]-link.t[0] + 1e-6)
+        ax.set_xlim(l_left, l_right)
+        lv = np.array(list(link.lat_ms)+list(link.rtt_ms)); lv = lv[np.isfinite(lv)]
+        if lv.size:
+            ax.set_ylim(min(0.0, float(lv.min())), max(float(lv.max()), 1.0)*1.1)
+        rtt = link.rtt_ms[-1]
+        rtt_txt = f'rtt {rtt:.0f} ms' if np.isfinite(rtt) else 'coarse, no TIMESYNC'
+        ax.set_title(f'Link latency (e2e {link.lat_ms[-1]:.0f} ms, {rtt_txt})')
+        artists.extend([lines['link_lat'], lines['link_rtt']])
     # mission
     if ctx.mission_line is not None:
         missions = state.mission.missions[:-1] # exclude last two dummy items
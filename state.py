@@ -1,6 +1,9 @@
+import bisect, threading
 from collections import deque
-from dataclasses import dataclass
-from typing import Deque, List
+from itertools import islice
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional
+import numpy as np
 
 @dataclass
 class Buffer:
@@ -10,7 +13,26 @@ class AttitudeBuffer:
     t: Deque[float]; roll: Deque[float]; pitch: Deque[float]; yaw: Deque[float]
 @dataclass
 class VelBuffer:
-    t: Deque[float]; vx: Deque[float]; vy: Deque[float]; vz: Deque[float]; vx_sp: Deque[float]; vy_sp: Deque[float]; vz_sp: Deque[float]
+    # Measured (t, vx..) and setpoint (t_sp, vx_sp..) are independent streams; align lazily via aligned()
+    t: Deque[float]; vx: Deque[float]; vy: Deque[float]; vz: Deque[float]
+    t_sp: Deque[float]; vx_sp: Deque[float]; vy_sp: Deque[float]; vz_sp: Deque[float]
+
+    def measured(self, t_left=None):
+        """Measured (t, vx, vy, vz) arrays with t >= t_left."""
+        return _window((self.t, self.vx, self.vy, self.vz), t_left)
+
+    def setpoints(self, t_left=None):
+        """Setpoint (t_sp, vx_sp, vy_sp, vz_sp) arrays with t_sp >= t_left, plus the one held at t_left."""
+        return _window((self.t_sp, self.vx_sp, self.vy_sp, self.vz_sp), t_left, hold=True)
+
+    def aligned(self, t_left=None):
+        """Measured samples with t >= t_left plus setpoints held at their timestamps.
+
+        Returns (t, vx, vy, vz, vx_sp, vy_sp, vz_sp) as float arrays.
+        """
+        t, *meas = self.measured(t_left)
+        t_sp, *sp = self.setpoints(t_left)
+        return (t, *meas, *(sample_hold(t_sp, a, t) for a in sp))
 @dataclass
 class ImuBuffer:
     t: Deque[float]; ax: Deque[float]; ay: Deque[float]; az: Deque[float]; gx: Deque[float]; gy: Deque[float]; gz: Deque[float]
@@ -21,6 +43,9 @@ class AltBuffer:
 class GpsBuffer:
     t: Deque[float]; sats: Deque[int]; eph: Deque[float]; epv: Deque[float]; fix: Deque[int]
 @dataclass
+class LinkBuffer:
+    t: Deque[float]; lat_ms: Deque[float]; rtt_ms: Deque[float]  # end-to-end latency, TIMESYNC round trip
+@dataclass
 class ServoBuffer:
     t: Deque[float]; ch: List[Deque[int]]
 
@@ -28,6 +53,43 @@ class ServoBuffer:
 class MissionState:
     missions: List[tuple]
 
+
+def sample_hold(t_src, v_src, t_query):
+    """Zero-order hold of samples (t_src, v_src) evaluated at t_query (NaN before the first sample)."""
+    t_src = np.asarray(t_src, dtype=float); v_src = np.asarray(v_src, dtype=float)
+    t_query = np.asarray(t_query, dtype=float)
+    out = np.full(t_query.shape, np.nan)
+    if t_src.size == 0:
+        return out
+    idx = np.searchsorted(t_src, t_query, side='right') - 1
+    ok = idx >= 0
+    out[ok] = v_src[idx[ok]]
+    return out
+
+
+def _window(dqs, t_left, hold=False):
+    """Convert only the tail of parallel deques with dqs[0] >= t_left (one earlier sample if hold)."""
+    n = min(len(d) for d in dqs)
+    i0 = 0
+    if t_left is not None:
+        i0 = bisect.bisect_left(dqs[0], t_left, 0, n)
+        if hold: i0 = max(i0 - 1, 0)
+    return [np.fromiter(islice(d, i0, n), dtype=float, count=n - i0) for d in dqs]
+
+@dataclass
+class PsdResult:
+    f: np.ndarray; acc: np.ndarray; gyro: np.ndarray
+    peaks_acc: List[tuple]; peaks_gyro: List[tuple]  # (freq_hz, psd) of estimated dominant peaks
+    fs: float; n_seg: int
+@dataclass
+class TrackResult:
+    t: np.ndarray; ex: np.ndarray; ey: np.ndarray; ez: np.ndarray; norm: np.ndarray  # RMS tracking error
+@dataclass
+class AnalyticsState:
+    # Replaced as whole objects by analytics.AnalyticsEngine; the renderer reads them lock-free
+    psd: Optional[PsdResult] = None
+    track: Optional[TrackResult] = None
+
 @dataclass
 class AppState:
     pos: Buffer
@@ -37,17 +99,24 @@ class AppState:
     alt: AltBuffer
     gps: GpsBuffer
     servo: ServoBuffer
+    link: LinkBuffer
     mission: MissionState
+    analytics: AnalyticsState
+    lock: threading.Lock = field(default_factory=threading.Lock)  # held by poll() while appending
 
 
 def create_state(window: int) -> AppState:
     dq = lambda: deque(maxlen=window)
     pos = Buffer(dq(), dq(), dq(), dq())
     att = AttitudeBuffer(dq(), dq(), dq(), dq())
-    vel = VelBuffer(*(dq() for _ in range(7)))
+    # measured and setpoint streams each keep half the window: same time span as the former
+    # padded 7-deque layout at about half its memory
+    vdq = lambda: deque(maxlen=max(1, window // 2))
+    vel = VelBuffer(*(vdq() for _ in range(8)))
     imu = ImuBuffer(*(dq() for _ in range(7)))
     alt = AltBuffer(dq(), dq(), dq())
     gps = GpsBuffer(dq(), dq(), dq(), dq(), dq())
     servo = ServoBuffer(dq(), [dq() for _ in range(8)])
+    link = LinkBuffer(dq(), dq(), dq())
     mission = MissionState([])
-    return AppState(pos, att, vel, imu, alt, gps, servo, mission)
+    return AppState(pos, att, vel, imu, alt, gps, servo, link, mission, AnalyticsState())
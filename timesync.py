@@ -0,0 +1,110 @@
+import time
+from collections import deque
+import numpy as np
+
+# Messages whose time_usec is 32-bit (wraps after ~71 min) and must not be mapped
+_UNSTAMPED = ('SERVO_OUTPUT_RAW',)
+
+
+def remote_time(msg):
+    """Vehicle boot time [s] carried by msg (time_boot_ms / time_usec), or None."""
+    if msg.get_type() in _UNSTAMPED:
+        return None
+    tb = getattr(msg, 'time_boot_ms', None)
+    if tb:
+        return tb * 1e-3
+    tu = getattr(msg, 'time_usec', None)
+    if tu and tu < 1e15:  # larger values are UNIX epoch (e.g. GPS time), not boot time
+        return tu * 1e-6
+    return None
+
+
+class TimeSync:
+    """Estimates local wall clock minus vehicle boot clock.
+
+    Primary source is a TIMESYNC exchange: each reply gives an RTT and a
+    midpoint offset; the offset is the median over the replies whose RTT is
+    close to the window minimum (least queued, so least asymmetric). Until
+    a reply arrives, SYSTEM_TIME gives a coarse offset (min of local - boot,
+    biased by the smallest one-way latency). A backward step of the
+    autopilot's monotonic clocks (TIMESYNC tc1, SYSTEM_TIME time_boot_ms)
+    is a reboot: all estimates are dropped and `epoch` is incremented.
+    """
+    def __init__(self, logger, rate_hz=2.0, window=32):
+        self.logger = logger
+        self.period = 1.0 / max(rate_hz, 1e-3)
+        self._pending = {}  # ts1 [ns] we sent -> send wall time [s]
+        self._samples = deque(maxlen=window)  # (rtt_s, offset_s)
+        self._coarse = deque(maxlen=window)  # local - boot from SYSTEM_TIME
+        self._last_send = 0.0
+        self.offset = None  # local wall [s] - vehicle boot [s]
+        self.rtt = None
+        self.source = None  # 'timesync' | 'system_time'
+        self._last_tc1 = None
+        self._last_boot = None  # last SYSTEM_TIME boot time [s]
+        self.epoch = 0  # incremented on every vehicle reboot
+
+    def tick(self, conn, target_system, target_component):
+        now = time.time()
+        if now - self._last_send < self.period or conn is None:
+            return
+        self._last_send = now
+        for k in [k for k, ts in self._pending.items() if now - ts > 5.0]:
+            del self._pending[k]
+        ts1 = time.time_ns()
+        try:
+            try:
+                conn.mav.timesync_send(0, ts1, target_system, target_component)
+            except TypeError:  # dialect without target extension fields
+                conn.mav.timesync_send(0, ts1)
+            self._pending[ts1] = now
+        except Exception as e:
+            self.logger.debug(f"TIMESYNC send failed: {e}")
+
+    def handle_timesync(self, msg):
+        tc1 = getattr(msg, 'tc1', 0); ts1 = getattr(msg, 'ts1', 0)
+        if tc1 == 0 or ts1 not in self._pending:
+            return  # a request, or a reply to someone else's request
+        del self._pending[ts1]
+        if self._last_tc1 is not None and tc1 < self._last_tc1:
+            self._reset('TIMESYNC tc1 stepped back')
+        self._last_tc1 = tc1
+        now_ns = time.time_ns()
+        rtt = (now_ns - ts1) * 1e-9
+        self._samples.append((rtt, ((ts1 + now_ns) / 2 - tc1) * 1e-9))
+        s = np.array(self._samples)
+        best = s[s[:, 0] <= s[:, 0].min() * 1.5 + 1e-3]
+        if self.source != 'timesync':
+            self.logger.info(f"⏱ Time sync via TIMESYNC (rtt={rtt*1e3:.1f} ms)")
+        self.offset = float(np.median(best[:, 1]))
+        self.rtt = float(np.median(s[-5:, 0]))
+        self.source = 'timesync'
+
+    def handle_system_time(self, msg):
+        tb = getattr(msg, 'time_boot_ms', 0)
+        if not tb:
+            return
+        t_boot = tb * 1e-3
+        # 1 s tolerance: the passive link may deliver a copy slightly behind the active one
+        if self._last_boot is not None and t_boot < self._last_boot - 1.0:
+            self._reset(f'SYSTEM_TIME boot time stepped back ({self._last_boot:.1f} s -> {t_boot:.1f} s)')
+        self._last_boot = t_boot if self._last_boot is None else max(self._last_boot, t_boot)
+        self._coarse.append(time.time() - t_boot)
+        if self.source != 'timesync':
+            if self.source is None:
+                self.logger.info("⏱ Coarse time sync via SYSTEM_TIME (waiting for TIMESYNC)")
+            self.offset = min(self._coarse)
+            self.source = 'system_time'
+
+    def _reset(self, reason):
+        self.logger.warning(f"⏱ Vehicle clock reset ({reason}); time sync restarted")
+        self._samples.clear(); self._coarse.clear()
+        self._last_tc1 = None; self._last_boot = None
+        self.offset = None; self.rtt = None; self.source = None
+        self.epoch += 1
+
+    def to_local(self, t_remote):
+        """Map vehicle boot time [s] to local wall time [s] (None until synced)."""
+        if self.offset is None or t_remote is None:
+            return None
+        return t_remote + self.offset